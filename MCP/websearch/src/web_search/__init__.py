@@ -1,3 +1,11 @@
-from .server import mcp
-
 __all__ = ["mcp"]
+
+
+def __getattr__(name: str):
+    # 延迟导入 server，避免仅使用 config / sources 等子模块时加载 fastmcp
+    if name == "mcp":
+        from .server import mcp
+
+        globals()["mcp"] = mcp
+        return mcp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
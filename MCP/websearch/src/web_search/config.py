@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import json
 import os
+import sys
 import tempfile
 from pathlib import Path
+from typing import Iterable
 
 
 class Config:
@@ -15,6 +17,7 @@ class Config:
         '"env":{"GROK_API_URL":"your-api-url","GROK_API_KEY":"your-api-key"}}\''
     )
     _DEFAULT_MODEL = "grok-4-fast"
+    _TRUTHY_VALUES = frozenset({"true", "1", "yes"})
 
     def __new__(cls):
         if cls._instance is None:
@@ -22,6 +25,7 @@ class Config:
             cls._instance._config_file = None
             cls._instance._cached_model = None
             cls._instance._env_file_cache = None
+            cls._instance._log_dir_cache = None
         return cls._instance
 
     @property
@@ -73,38 +77,42 @@ class Config:
         return deduplicated
 
     @staticmethod
-    def _parse_env_file(path: Path) -> dict[str, str]:
+    def _parse_env_lines(lines: Iterable[str]) -> dict[str, str]:
+        env_data: dict[str, str] = {}
+        for raw_line in lines:
+            line = raw_line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("export "):
+                line = line[7:].strip()
+            if "=" not in line:
+                continue
+            key, value = line.split("=", 1)
+            key = key.strip()
+            value = value.strip()
+            if not key:
+                continue
+            if (
+                len(value) >= 2
+                and value[0] == value[-1]
+                and value[0] in ('"', "'")
+            ):
+                value = value[1:-1]
+            # 驻留键名：与代码中的设置名字面量为同一对象，后续字典查找走 is 快路径
+            env_data[sys.intern(key)] = value
+        return env_data
+
+    @classmethod
+    def _parse_env_file(cls, path: Path) -> dict[str, str]:
         if not path.exists() or not path.is_file():
             return {}
 
-        env_data: dict[str, str] = {}
         try:
             with open(path, "r", encoding="utf-8") as file:
-                for raw_line in file:
-                    line = raw_line.strip()
-                    if not line or line.startswith("#"):
-                        continue
-                    if line.startswith("export "):
-                        line = line[7:].strip()
-                    if "=" not in line:
-                        continue
-                    key, value = line.split("=", 1)
-                    key = key.strip()
-                    value = value.strip()
-                    if not key:
-                        continue
-                    if (
-                        len(value) >= 2
-                        and value[0] == value[-1]
-                        and value[0] in ('"', "'")
-                    ):
-                        value = value[1:-1]
-                    env_data[key] = value
+                return cls._parse_env_lines(file)
         except OSError:
             return {}
 
-        return env_data
-
     def _load_env_file_values(self) -> dict[str, str]:
         if self._env_file_cache is not None:
             return self._env_file_cache
@@ -142,11 +150,11 @@ class Config:
 
     @property
     def debug_enabled(self) -> bool:
-        return (self._get_setting("GROK_DEBUG", "false") or "false").lower() in (
-            "true",
-            "1",
-            "yes",
-        )
+        return self._safe_bool(self._get_setting("GROK_DEBUG", "false"), False)
+
+    @classmethod
+    def _safe_bool(cls, value: str | None, default: bool) -> bool:
+        return value.lower() in cls._TRUTHY_VALUES if value else default
 
     @staticmethod
     def _safe_int(value: str | None, default: int) -> int:
@@ -180,6 +188,38 @@ class Config:
             self._get_setting("TAVILY_KEY_COOLDOWN_SECONDS", "60"), 60
         )
 
+    @property
+    def firecrawl_cooldown_seconds(self) -> int:
+        return self._safe_int(
+            self._get_setting("FIRECRAWL_COOLDOWN_SECONDS", "60"), 60
+        )
+
+    @property
+    def fetch_max_concurrency(self) -> int:
+        return max(
+            self._safe_int(self._get_setting("WEB_FETCH_MAX_CONCURRENCY", "4"), 4), 1
+        )
+
+    @property
+    def fetch_timeout_seconds(self) -> int:
+        return max(
+            self._safe_int(self._get_setting("WEB_FETCH_TIMEOUT_SECONDS", "180"), 180), 1
+        )
+
+    @property
+    def fetch_cache_ttl_seconds(self) -> int:
+        return max(
+            self._safe_int(self._get_setting("WEB_FETCH_CACHE_TTL_SECONDS", "0"), 0), 0
+        )
+
+    @property
+    def fetch_parallel_backends(self) -> bool:
+        return self._safe_bool(self._get_setting("WEB_FETCH_PARALLEL_BACKENDS", "false"), False)
+
+    @property
+    def grok_max_concurrency(self) -> int:
+        return max(self._safe_int(self._get_setting("GROK_MAX_CONCURRENCY", "4"), 4), 1)
+
     @property
     def grok_api_url(self) -> str:
         url = self._get_setting("GROK_API_URL")
@@ -202,11 +242,7 @@ class Config:
 
     @property
     def tavily_enabled(self) -> bool:
-        return (self._get_setting("TAVILY_ENABLED", "true") or "true").lower() in (
-            "true",
-            "1",
-            "yes",
-        )
+        return self._safe_bool(self._get_setting("TAVILY_ENABLED", "true"), True)
 
     @property
     def tavily_api_url(self) -> str:
@@ -247,6 +283,15 @@ class Config:
     @property
     def log_dir(self) -> Path:
         log_dir_str = self._get_setting("GROK_LOG_DIR", "logs") or "logs"
+        # 目录探测涉及多次 mkdir，按配置值缓存解析结果，避免每次访问都触碰文件系统
+        if self._log_dir_cache is not None and self._log_dir_cache[0] == log_dir_str:
+            return self._log_dir_cache[1]
+        log_dir = self._resolve_log_dir(log_dir_str)
+        self._log_dir_cache = (log_dir_str, log_dir)
+        return log_dir
+
+    @staticmethod
+    def _resolve_log_dir(log_dir_str: str) -> Path:
         log_dir = Path(log_dir_str)
         if log_dir.is_absolute():
             return log_dir
@@ -315,6 +360,7 @@ class Config:
             config_status = f"❌ 配置错误: {str(exc)}"
 
         tavily_keys = self.tavily_api_keys
+        firecrawl_key = self.firecrawl_api_key
         env_files = [str(path) for path in self._iter_env_files() if path.exists()]
 
         return {
@@ -331,8 +377,8 @@ class Config:
             else "未配置",
             "TAVILY_API_KEYS_COUNT": len(tavily_keys),
             "FIRECRAWL_API_URL": self.firecrawl_api_url,
-            "FIRECRAWL_API_KEY": self._mask_api_key(self.firecrawl_api_key)
-            if self.firecrawl_api_key
+            "FIRECRAWL_API_KEY": self._mask_api_key(firecrawl_key)
+            if firecrawl_key
             else "未配置",
             "ENV_FILES_LOADED": env_files,
             "config_status": config_status,
@@ -1,27 +1,60 @@
+import atexit
 import logging
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from .config import config
 
 logger = logging.getLogger("web_search")
-logger.setLevel(getattr(logging, config.log_level, logging.INFO))
+
+_listener: QueueListener | None = None
 
 _formatter = logging.Formatter(
     '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 
-try:
-    log_dir = config.log_dir
-    log_dir.mkdir(parents=True, exist_ok=True)
-    log_file = log_dir / f"web_search_{datetime.now().strftime('%Y%m%d')}.log"
-
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
-    file_handler.setLevel(getattr(logging, config.log_level, logging.INFO))
-    file_handler.setFormatter(_formatter)
-    logger.addHandler(file_handler)
-except OSError:
-    logger.addHandler(logging.NullHandler())
+
+def setup_logging() -> None:
+    global _listener
+    # 幂等：模块被以不同包名重复导入时，不重复解析配置、不重复挂载 handler
+    if logger.handlers:
+        return
+
+    level = getattr(logging, config.log_level, logging.INFO)
+    logger.setLevel(level)
+    try:
+        log_dir = config.log_dir
+        log_dir.mkdir(parents=True, exist_ok=True)
+        log_file = log_dir / f"web_search_{datetime.now().strftime('%Y%m%d')}.log"
+
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler.setLevel(level)
+        file_handler.setFormatter(_formatter)
+
+        # QueueHandler.prepare() 仍在调用线程（事件循环）上格式化消息；
+        # 文件处理器的格式化与磁盘写入交给后台监听线程，避免阻塞并发请求
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, file_handler)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        logger.addHandler(QueueHandler(log_queue))
+    except OSError:
+        logger.addHandler(logging.NullHandler())
+
+
+def shutdown_logging() -> None:
+    """停止后台监听线程并写完队列中剩余的日志；os._exit 会跳过 atexit，退出前需显式调用"""
+    global _listener
+
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+setup_logging()
+
 
 async def log_info(ctx, message: str, is_debug: bool = False):
     if is_debug:
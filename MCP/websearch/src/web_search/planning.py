@@ -87,7 +87,8 @@ _MERGE_STRATEGY_PHASE = "search_strategy"
 
 
 def _split_csv(value: str) -> list[str]:
-    return [s.strip() for s in value.split(",") if s.strip()] if value else []
+    # 每段只 strip 一次
+    return [item for s in value.split(",") if (item := s.strip())] if value else []
 
 
 class PhaseRecord(BaseModel):
@@ -198,7 +199,8 @@ class PlanningEngine:
             "plan_complete": complete,
         }
 
-        remaining = [p for p in PHASE_NAMES if p in session.required_phases() and p not in session.phases]
+        required = session.required_phases()
+        remaining = [p for p in PHASE_NAMES if p in required and p not in session.phases]
         if remaining:
             result["phases_remaining"] = remaining
 
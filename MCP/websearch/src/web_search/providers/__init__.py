@@ -1,4 +1,13 @@
 from .base import BaseSearchProvider, SearchResult
-from .grok import GrokSearchProvider
 
 __all__ = ["BaseSearchProvider", "SearchResult", "GrokSearchProvider"]
+
+
+def __getattr__(name: str):
+    # 延迟导入 grok，避免仅使用 base 时加载 httpx / tenacity
+    if name == "GrokSearchProvider":
+        from .grok import GrokSearchProvider
+
+        globals()["GrokSearchProvider"] = GrokSearchProvider
+        return GrokSearchProvider
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
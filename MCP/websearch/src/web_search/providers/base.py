@@ -3,6 +3,8 @@ from typing import Dict, List
 
 
 class SearchResult:
+    __slots__ = ("title", "url", "snippet", "source", "published_date")
+
     def __init__(
         self,
         title: str,
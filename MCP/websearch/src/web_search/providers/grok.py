@@ -1,3 +1,4 @@
+import asyncio
 import httpx
 import json
 from datetime import datetime, timezone
@@ -5,12 +6,13 @@ from email.utils import parsedate_to_datetime
 from typing import List, Optional
 from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
 from tenacity.wait import wait_base
-from zoneinfo import ZoneInfo
 from .base import BaseSearchProvider, SearchResult
 from ..utils import search_prompt, fetch_prompt, url_describe_prompt, rank_sources_prompt
 from ..logger import log_info
 from ..config import config
 
+_WEEKDAYS_CN = ("星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日")
+
 
 def get_local_time_info() -> str:
     """获取本地时间信息，用于注入到搜索查询中"""
@@ -23,8 +25,7 @@ def get_local_time_info() -> str:
         local_now = datetime.now(timezone.utc)
 
     # 格式化时间信息
-    weekdays_cn = ["星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日"]
-    weekday = weekdays_cn[local_now.weekday()]
+    weekday = _WEEKDAYS_CN[local_now.weekday()]
 
     return (
         f"[Current Time Context]\n"
@@ -34,45 +35,13 @@ def get_local_time_info() -> str:
     )
 
 
-def _needs_time_context(query: str) -> bool:
-    """检查查询是否需要时间上下文"""
-    # 中文时间相关关键词
-    cn_keywords = [
-        "当前", "现在", "今天", "明天", "昨天",
-        "本周", "上周", "下周", "这周",
-        "本月", "上月", "下月", "这个月",
-        "今年", "去年", "明年",
-        "最新", "最近", "近期", "刚刚", "刚才",
-        "实时", "即时", "目前",
-    ]
-    # 英文时间相关关键词
-    en_keywords = [
-        "current", "now", "today", "tomorrow", "yesterday",
-        "this week", "last week", "next week",
-        "this month", "last month", "next month",
-        "this year", "last year", "next year",
-        "latest", "recent", "recently", "just now",
-        "real-time", "realtime", "up-to-date",
-    ]
-
-    query_lower = query.lower()
-
-    for keyword in cn_keywords:
-        if keyword in query:
-            return True
-
-    for keyword in en_keywords:
-        if keyword in query_lower:
-            return True
-
-    return False
-
 RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+_RETRYABLE_EXCEPTIONS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
 
 
 def _is_retryable_exception(exc) -> bool:
     """检查异常是否可重试"""
-    if isinstance(exc, (httpx.TimeoutException, httpx.NetworkError, httpx.ConnectError, httpx.RemoteProtocolError)):
+    if isinstance(exc, _RETRYABLE_EXCEPTIONS):
         return True
     if isinstance(exc, httpx.HTTPStatusError):
         return exc.response.status_code in RETRYABLE_STATUS_CODES
@@ -117,19 +86,52 @@ class _WaitWithRetryAfter(wait_base):
             return None
 
 
+_HTTP_TIMEOUT = httpx.Timeout(connect=6.0, read=120.0, write=10.0, pool=None)
+_HTTP_CLIENT: httpx.AsyncClient | None = None
+_REQUEST_SEMAPHORE: asyncio.Semaphore | None = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """进程内共享的 AsyncClient，跨请求复用连接池与 TLS 会话"""
+    global _HTTP_CLIENT
+
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = httpx.AsyncClient(timeout=_HTTP_TIMEOUT, follow_redirects=True)
+    return _HTTP_CLIENT
+
+
+async def close_http_client() -> None:
+    """关闭共享 AsyncClient，服务退出时调用"""
+    global _HTTP_CLIENT
+
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
+
+def _get_request_semaphore() -> asyncio.Semaphore:
+    """Grok 并发闸门：限制同时在途的流式请求数，突发调用时排队而不是集体触发上游 429"""
+    global _REQUEST_SEMAPHORE
+
+    if _REQUEST_SEMAPHORE is None:
+        _REQUEST_SEMAPHORE = asyncio.Semaphore(config.grok_max_concurrency)
+    return _REQUEST_SEMAPHORE
+
+
 class GrokSearchProvider(BaseSearchProvider):
     def __init__(self, api_url: str, api_key: str, model: str = "grok-4-fast"):
         super().__init__(api_url, api_key)
         self.model = model
+        # 请求头只依赖 api_key，构造时生成一次，各请求复用
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
 
     def get_provider_name(self) -> str:
         return "Grok"
 
     async def search(self, query: str, platform: str = "", min_results: int = 3, max_results: int = 10, ctx=None) -> List[SearchResult]:
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
         platform_prompt = ""
 
         if platform:
@@ -151,13 +153,9 @@ class GrokSearchProvider(BaseSearchProvider):
 
         await log_info(ctx, f"platform_prompt: { query + platform_prompt}", config.debug_enabled)
 
-        return await self._execute_stream_with_retry(headers, payload, ctx)
+        return await self._execute_stream_with_retry(self.headers, payload, ctx)
 
     async def fetch(self, url: str, ctx=None) -> str:
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
         payload = {
             "model": self.model,
             "messages": [
@@ -169,35 +167,39 @@ class GrokSearchProvider(BaseSearchProvider):
             ],
             "stream": True,
         }
-        return await self._execute_stream_with_retry(headers, payload, ctx)
+        return await self._execute_stream_with_retry(self.headers, payload, ctx)
 
     async def _parse_streaming_response(self, response, ctx=None) -> str:
-        content = ""
-        full_body_buffer = [] 
+        # 增量片段先收集再一次性拼接，避免逐个 += 造成的反复拷贝
+        content_parts: list[str] = []
+        # 仅缓存非 SSE 行，用于非流式 JSON 响应的兜底解析；SSE 行拼接后不可能是合法 JSON，无需保留整份响应体
+        full_body_buffer = []
         
         async for line in response.aiter_lines():
             line = line.strip()
             if not line:
                 continue
-            
-            full_body_buffer.append(line)
+
+            if not line.startswith("data:"):
+                full_body_buffer.append(line)
+                continue
 
             # 兼容 "data: {...}" 和 "data:{...}" 两种 SSE 格式
-            if line.startswith("data:"):
-                if line in ("data: [DONE]", "data:[DONE]"):
-                    continue
-                try:
-                    # 去掉 "data:" 前缀，并去除可能的空格
-                    json_str = line[5:].lstrip()
-                    data = json.loads(json_str)
-                    choices = data.get("choices", [])
-                    if choices and len(choices) > 0:
-                        delta = choices[0].get("delta", {})
-                        if "content" in delta:
-                            content += delta["content"]
-                except (json.JSONDecodeError, IndexError):
-                    continue
-                
+            if line in ("data: [DONE]", "data:[DONE]"):
+                continue
+            try:
+                # 去掉 "data:" 前缀，并去除可能的空格
+                json_str = line[5:].lstrip()
+                data = json.loads(json_str)
+                choices = data.get("choices", [])
+                if choices and len(choices) > 0:
+                    delta = choices[0].get("delta", {})
+                    if "content" in delta:
+                        content_parts.append(delta["content"])
+            except (json.JSONDecodeError, IndexError):
+                continue
+
+        content = "".join(content_parts)
         if not content and full_body_buffer:
             try:
                 full_text = "".join(full_body_buffer)
@@ -214,31 +216,27 @@ class GrokSearchProvider(BaseSearchProvider):
 
     async def _execute_stream_with_retry(self, headers: dict, payload: dict, ctx=None) -> str:
         """执行带重试机制的流式 HTTP 请求"""
-        timeout = httpx.Timeout(connect=6.0, read=120.0, write=10.0, pool=None)
-
-        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-            async for attempt in AsyncRetrying(
-                stop=stop_after_attempt(config.retry_max_attempts + 1),
-                wait=_WaitWithRetryAfter(config.retry_multiplier, config.retry_max_wait),
-                retry=retry_if_exception(_is_retryable_exception),
-                reraise=True,
-            ):
-                with attempt:
-                    async with client.stream(
-                        "POST",
-                        f"{self.api_url}/chat/completions",
-                        headers=headers,
-                        json=payload,
-                    ) as response:
-                        response.raise_for_status()
-                        return await self._parse_streaming_response(response, ctx)
+        client = _get_http_client()
+        semaphore = _get_request_semaphore()
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(config.retry_max_attempts + 1),
+            wait=_WaitWithRetryAfter(config.retry_multiplier, config.retry_max_wait),
+            retry=retry_if_exception(_is_retryable_exception),
+            reraise=True,
+        ):
+            # 信号量只包住单次请求，退避等待期间不占用名额
+            with attempt:
+                async with semaphore, client.stream(
+                    "POST",
+                    f"{self.api_url}/chat/completions",
+                    headers=headers,
+                    json=payload,
+                ) as response:
+                    response.raise_for_status()
+                    return await self._parse_streaming_response(response, ctx)
 
     async def describe_url(self, url: str, ctx=None) -> dict:
         """让 Grok 阅读单个 URL 并返回 title + extracts"""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
         payload = {
             "model": self.model,
             "messages": [
@@ -247,7 +245,7 @@ class GrokSearchProvider(BaseSearchProvider):
             ],
             "stream": True,
         }
-        result = await self._execute_stream_with_retry(headers, payload, ctx)
+        result = await self._execute_stream_with_retry(self.headers, payload, ctx)
         title, extracts = url, ""
         for line in result.strip().splitlines():
             if line.startswith("Title:"):
@@ -258,10 +256,6 @@ class GrokSearchProvider(BaseSearchProvider):
 
     async def rank_sources(self, query: str, sources_text: str, total: int, ctx=None) -> list[int]:
         """让 Grok 按查询相关度对信源排序，返回排序后的序号列表"""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
         payload = {
             "model": self.model,
             "messages": [
@@ -270,7 +264,7 @@ class GrokSearchProvider(BaseSearchProvider):
             ],
             "stream": True,
         }
-        result = await self._execute_stream_with_retry(headers, payload, ctx)
+        result = await self._execute_stream_with_retry(self.headers, payload, ctx)
         order: list[int] = []
         seen: set[int] = set()
         for token in result.strip().split():
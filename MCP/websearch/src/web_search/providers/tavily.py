@@ -18,6 +18,7 @@ class TavilyClient:
         self._lock = asyncio.Lock()
         self._next_index = 0
         self._cooldowns: dict[str, float] = {}
+        self._http_client: httpx.AsyncClient | None = None
 
     @property
     def is_configured(self) -> bool:
@@ -114,11 +115,10 @@ class TavilyClient:
             endpoint = f"{self.api_url}{path}"
             headers = {"Authorization": f"Bearer {key}", "Content-Type": "application/json"}
             try:
-                async with httpx.AsyncClient(timeout=timeout) as client:
-                    response = await client.post(endpoint, headers=headers, json=body)
-                    response.raise_for_status()
-                    await self._mark_success(key)
-                    return response.json()
+                response = await self._get_http_client().post(endpoint, headers=headers, json=body, timeout=timeout)
+                response.raise_for_status()
+                await self._mark_success(key)
+                return response.json()
             except httpx.HTTPStatusError as exc:
                 status_code = exc.response.status_code
                 errors.append(f"{status_code}@{self._mask_key(key)}")
@@ -136,6 +136,17 @@ class TavilyClient:
             raise RuntimeError(f"All Tavily API keys failed: {', '.join(errors)}")
         return None
 
+    def _get_http_client(self) -> httpx.AsyncClient:
+        # 客户端实例内共享连接池：跨请求、跨 Key 轮换复用 TCP/TLS 连接，超时按请求单独传入
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient()
+        return self._http_client
+
+    async def aclose(self) -> None:
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
     async def _candidate_indices(self) -> list[int]:
         async with self._lock:
             total = len(self.api_keys)
@@ -12,23 +12,48 @@ from pydantic import Field
 
 # 尝试使用绝对导入（支持 mcp run）
 try:
-    from web_search.providers.grok import GrokSearchProvider
+    from web_search.providers.grok import (
+        RETRYABLE_STATUS_CODES,
+        _RETRYABLE_EXCEPTIONS,
+        GrokSearchProvider,
+        close_http_client as close_grok_http_client,
+    )
     from web_search.providers.tavily import TavilyClient
-    from web_search.logger import log_info
+    from web_search.logger import log_info, shutdown_logging
     from web_search.config import config
     from web_search.sources import SourcesCache, merge_sources, new_session_id, split_answer_and_sources
     from web_search.planning import engine as planning_engine, _split_csv
 except ImportError:
-    from .providers.grok import GrokSearchProvider
+    from .providers.grok import (
+        RETRYABLE_STATUS_CODES,
+        _RETRYABLE_EXCEPTIONS,
+        GrokSearchProvider,
+        close_http_client as close_grok_http_client,
+    )
     from .providers.tavily import TavilyClient
-    from .logger import log_info
+    from .logger import log_info, shutdown_logging
     from .config import config
     from .sources import SourcesCache, merge_sources, new_session_id, split_answer_and_sources
     from .planning import engine as planning_engine, _split_csv
 
 import asyncio
+import json
+import random
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+
+@asynccontextmanager
+async def _lifespan(server):
+    """服务生命周期：退出时关闭共享的 HTTP 客户端，释放连接池"""
+    try:
+        yield {}
+    finally:
+        await _close_http_clients()
 
-mcp = FastMCP("web-search")
+
+mcp = FastMCP("web-search", lifespan=_lifespan)
 
 _SOURCES_CACHE = SourcesCache(max_size=256)
 _AVAILABLE_MODELS_CACHE: dict[tuple[str, str], list[str]] = {}
@@ -37,6 +62,95 @@ _TAVILY_CLIENT: TavilyClient | None = None
 _TAVILY_CLIENT_FINGERPRINT: tuple[str, tuple[str, ...], int] | None = None
 
 
+class _CircuitBreaker:
+    """按接口熔断：连续失败达到阈值后，冷却期内直接跳过请求；冷却结束后首个失败立即重新熔断"""
+
+    def __init__(self, failure_threshold: int = 5):
+        self.failure_threshold = failure_threshold
+        self._failures: dict[str, int] = {}
+        self._open_until: dict[str, float] = {}
+
+    def is_open(self, key: str) -> bool:
+        return self._open_until.get(key, 0.0) > time.monotonic()
+
+    def record_success(self, key: str) -> None:
+        self._failures.pop(key, None)
+        self._open_until.pop(key, None)
+
+    def record_failure(self, key: str, cooldown_seconds: int) -> None:
+        failures = self._failures.get(key, 0) + 1
+        self._failures[key] = failures
+        if failures >= self.failure_threshold and cooldown_seconds > 0:
+            self._open_until[key] = time.monotonic() + cooldown_seconds
+
+
+class _FetchCache:
+    """web_fetch 结果缓存：LRU 淘汰 + TTL 过期，并限制条目数与总字符数，避免大页面撑爆内存"""
+
+    def __init__(self, max_size: int = 128, max_chars: int = 8_000_000):
+        self._max_size = max_size
+        self._max_chars = max_chars
+        self._total_chars = 0
+        self._cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def _pop(self, url: str) -> None:
+        entry = self._cache.pop(url, None)
+        if entry is not None:
+            self._total_chars -= len(entry[1])
+
+    def get(self, url: str, ttl_seconds: int) -> str | None:
+        entry = self._cache.get(url)
+        if entry is None:
+            return None
+        stored_at, content = entry
+        if time.monotonic() - stored_at > ttl_seconds:
+            self._pop(url)
+            return None
+        self._cache.move_to_end(url)
+        return content
+
+    def set(self, url: str, content: str) -> None:
+        self._pop(url)
+        # 单条超过总预算的内容不缓存，免得为它清空整个缓存
+        if len(content) > self._max_chars:
+            return
+        self._cache[url] = (time.monotonic(), content)
+        self._total_chars += len(content)
+        while len(self._cache) > self._max_size or self._total_chars > self._max_chars:
+            _, (_, evicted) = self._cache.popitem(last=False)
+            self._total_chars -= len(evicted)
+
+
+_FIRECRAWL_BREAKER = _CircuitBreaker()
+_FETCH_CACHE = _FetchCache(max_size=128, max_chars=8_000_000)
+_FIRECRAWL_HTTP_CLIENT = None
+_FETCH_SEMAPHORE: asyncio.Semaphore | None = None
+
+
+def _get_firecrawl_client():
+    """Firecrawl 共享 AsyncClient：search / scrape 及其重试复用同一连接池，省去每次请求的 TCP/TLS 握手"""
+    import httpx
+    global _FIRECRAWL_HTTP_CLIENT
+
+    if _FIRECRAWL_HTTP_CLIENT is None or _FIRECRAWL_HTTP_CLIENT.is_closed:
+        _FIRECRAWL_HTTP_CLIENT = httpx.AsyncClient(timeout=90.0)
+    return _FIRECRAWL_HTTP_CLIENT
+
+
+def _get_fetch_semaphore() -> asyncio.Semaphore:
+    """web_fetch 并发闸门：限制同时进行的抓取数，防止突发调用压垮 Tavily / Firecrawl"""
+    global _FETCH_SEMAPHORE
+
+    if _FETCH_SEMAPHORE is None:
+        _FETCH_SEMAPHORE = asyncio.Semaphore(config.fetch_max_concurrency)
+    return _FETCH_SEMAPHORE
+
+
+def _dumps(obj) -> str:
+    """工具返回值统一的 JSON 序列化格式"""
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
 def _get_tavily_client() -> TavilyClient:
     global _TAVILY_CLIENT, _TAVILY_CLIENT_FINGERPRINT
 
@@ -46,6 +160,8 @@ def _get_tavily_client() -> TavilyClient:
         config.tavily_key_cooldown_seconds,
     )
     if _TAVILY_CLIENT is None or _TAVILY_CLIENT_FINGERPRINT != fingerprint:
+        # 旧客户端可能仍有进行中的请求，这里只替换引用，不主动关闭其连接池；
+        # .env 按进程缓存，指纹仅在 os.environ 变化时改变，替换极少发生
         _TAVILY_CLIENT = TavilyClient(
             api_url=fingerprint[0],
             api_keys=list(fingerprint[1]),
@@ -56,6 +172,18 @@ def _get_tavily_client() -> TavilyClient:
     return _TAVILY_CLIENT
 
 
+async def _close_http_clients() -> None:
+    """关闭进程内共享的 HTTP 客户端（Grok / Firecrawl / Tavily）"""
+    global _FIRECRAWL_HTTP_CLIENT
+
+    if _TAVILY_CLIENT is not None:
+        await _TAVILY_CLIENT.aclose()
+    if _FIRECRAWL_HTTP_CLIENT is not None:
+        await _FIRECRAWL_HTTP_CLIENT.aclose()
+        _FIRECRAWL_HTTP_CLIENT = None
+    await close_grok_http_client()
+
+
 async def _fetch_available_models(api_url: str, api_key: str) -> list[str]:
     import httpx
 
@@ -101,36 +229,25 @@ def _extra_results_to_sources(
     sources: list[dict] = []
     seen: set[str] = set()
 
-    if firecrawl_results:
-        for r in firecrawl_results:
+    # Firecrawl 优先；两个提供方仅描述字段名不同
+    for provider, results, desc_key in (
+        ("firecrawl", firecrawl_results, "description"),
+        ("tavily", tavily_results, "content"),
+    ):
+        for r in results or []:
             url = (r.get("url") or "").strip()
             if not url or url in seen:
                 continue
             seen.add(url)
-            item: dict = {"url": url, "provider": "firecrawl"}
+            item: dict = {"url": url, "provider": provider}
             title = (r.get("title") or "").strip()
             if title:
                 item["title"] = title
-            desc = (r.get("description") or "").strip()
+            desc = (r.get(desc_key) or "").strip()
             if desc:
                 item["description"] = desc
             sources.append(item)
 
-    if tavily_results:
-        for r in tavily_results:
-            url = (r.get("url") or "").strip()
-            if not url or url in seen:
-                continue
-            seen.add(url)
-            item: dict = {"url": url, "provider": "tavily"}
-            title = (r.get("title") or "").strip()
-            if title:
-                item["title"] = title
-            content = (r.get("content") or "").strip()
-            if content:
-                item["description"] = content
-            sources.append(item)
-
     return sources
 
 
@@ -172,8 +289,9 @@ async def web_search(
 
     grok_provider = GrokSearchProvider(api_url, api_key, effective_model)
 
-    # 计算额外信源配额
-    has_tavily = config.tavily_enabled and bool(config.tavily_api_keys)
+    # 计算额外信源配额（本次请求内复用同一个 Tavily 客户端，避免重复解析 Key 配置）
+    tavily_client = _get_tavily_client()
+    has_tavily = config.tavily_enabled and tavily_client.is_configured
     has_firecrawl = bool(config.firecrawl_api_key)
     firecrawl_count = 0
     tavily_count = 0
@@ -196,7 +314,7 @@ async def web_search(
     async def _safe_tavily() -> list[dict] | None:
         try:
             if tavily_count:
-                return await _call_tavily_search(query, tavily_count)
+                return await tavily_client.search(query, tavily_count)
         except Exception:
             return None
 
@@ -266,47 +384,65 @@ async def _call_tavily_extract(url: str) -> str | None:
         return None
 
 
-async def _call_tavily_search(query: str, max_results: int = 6) -> list[dict] | None:
-    client = _get_tavily_client()
-    if not client.is_configured:
-        return None
-    try:
-        return await client.search(query, max_results)
-    except Exception:
-        return None
+def _is_service_failure(exc: Exception) -> bool:
+    """只有说明服务本身不可用的错误才计入熔断：网络异常、鉴权失败、限流与 503；
+    其余 4xx/5xx 可能只是目标页面的问题，不应连累其他 URL"""
+    import httpx
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in (401, 403, 429, 503)
+    return True
+
+
+def _record_firecrawl_failure(endpoint: str, exc: Exception) -> None:
+    if _is_service_failure(exc):
+        _FIRECRAWL_BREAKER.record_failure(endpoint, config.firecrawl_cooldown_seconds)
 
 
 async def _call_firecrawl_search(query: str, limit: int = 14) -> list[dict] | None:
-    import httpx
     api_key = config.firecrawl_api_key
     if not api_key:
         return None
     endpoint = f"{config.firecrawl_api_url.rstrip('/')}/search"
+    if _FIRECRAWL_BREAKER.is_open(endpoint):
+        return None
     headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
     body = {"query": query, "limit": limit}
     try:
-        async with httpx.AsyncClient(timeout=90.0) as client:
-            response = await client.post(endpoint, headers=headers, json=body)
-            response.raise_for_status()
-            data = response.json()
-            results = data.get("data", {}).get("web", [])
-            return [
-                {"title": r.get("title", ""), "url": r.get("url", ""), "description": r.get("description", "")}
-                for r in results
-            ] if results else None
-    except Exception:
+        response = await _get_firecrawl_client().post(endpoint, headers=headers, json=body)
+        response.raise_for_status()
+        data = response.json()
+        _FIRECRAWL_BREAKER.record_success(endpoint)
+        results = data.get("data", {}).get("web", [])
+        return [
+            {"title": r.get("title", ""), "url": r.get("url", ""), "description": r.get("description", "")}
+            for r in results
+        ] if results else None
+    except Exception as e:
+        _record_firecrawl_failure(endpoint, e)
         return None
 
 
+def _full_jitter_delay(attempt: int) -> float:
+    """全抖动指数退避：在 [0, min(上限, 乘数 * 2^attempt)] 内均匀取值，避免并发重试同步"""
+    return random.uniform(0, min(config.retry_max_wait, config.retry_multiplier * (2 ** attempt)))
+
+
 async def _call_firecrawl_scrape(url: str, ctx=None) -> str | None:
     import httpx
     api_url = config.firecrawl_api_url
     api_key = config.firecrawl_api_key
     if not api_key:
         return None
+    debug = config.debug_enabled
     endpoint = f"{api_url.rstrip('/')}/scrape"
+    if _FIRECRAWL_BREAKER.is_open(endpoint):
+        await log_info(ctx, f"Firecrawl: {endpoint} 熔断中，跳过", debug)
+        return None
     headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
     max_retries = config.retry_max_attempts
+    client = _get_firecrawl_client()
+    # 熔断按调用计数：重试全部用尽（或遇到不可重试错误）后只记一次失败
+    last_error: Exception | None = None
     for attempt in range(max_retries):
         body = {
             "url": url,
@@ -314,21 +450,81 @@ async def _call_firecrawl_scrape(url: str, ctx=None) -> str | None:
             "timeout": 60000,
             "waitFor": (attempt + 1) * 1500,
         }
+        delay = None
         try:
-            async with httpx.AsyncClient(timeout=90.0) as client:
-                response = await client.post(endpoint, headers=headers, json=body)
-                response.raise_for_status()
-                data = response.json()
-                markdown = data.get("data", {}).get("markdown", "")
-                if markdown and markdown.strip():
-                    return markdown
-                await log_info(ctx, f"Firecrawl: markdown为空, 重试 {attempt + 1}/{max_retries}", config.debug_enabled)
+            response = await client.post(endpoint, headers=headers, json=body)
+            response.raise_for_status()
+            data = response.json()
+            _FIRECRAWL_BREAKER.record_success(endpoint)
+            last_error = None
+            markdown = data.get("data", {}).get("markdown", "")
+            if markdown and markdown.strip():
+                return markdown
+            # 空结果靠递增的 waitFor 重试，无需额外退避
+            await log_info(ctx, f"Firecrawl: markdown为空, 重试 {attempt + 1}/{max_retries}", debug)
+            continue
+        except httpx.HTTPStatusError as e:
+            status_code = e.response.status_code
+            last_error = e
+            if status_code not in RETRYABLE_STATUS_CODES:
+                await log_info(ctx, f"Firecrawl error: {e}", debug)
+                break
+            retry_after = (e.response.headers.get("Retry-After") or "").strip()
+            if retry_after.isdigit():
+                # 封顶：退避期间仍占用 web_fetch 并发名额，不能让服务端的长 Retry-After 拖住槽位
+                delay = min(float(retry_after), config.retry_max_wait)
+            await log_info(ctx, f"Firecrawl: HTTP {status_code}, 重试 {attempt + 1}/{max_retries}", debug)
+        except _RETRYABLE_EXCEPTIONS as e:
+            last_error = e
+            await log_info(ctx, f"Firecrawl: {type(e).__name__}, 重试 {attempt + 1}/{max_retries}", debug)
         except Exception as e:
-            await log_info(ctx, f"Firecrawl error: {e}", config.debug_enabled)
-            return None
+            last_error = e
+            await log_info(ctx, f"Firecrawl error: {e}", debug)
+            break
+        if attempt + 1 < max_retries:
+            await asyncio.sleep(delay if delay is not None else _full_jitter_delay(attempt))
+    if last_error is not None:
+        _record_firecrawl_failure(endpoint, last_error)
+    return None
+
+
+async def _extract_content(url: str, ctx=None, debug: bool = False) -> str | None:
+    async with _get_fetch_semaphore():
+        if config.fetch_parallel_backends:
+            return await _extract_content_parallel(url, ctx, debug)
+
+        result = await _call_tavily_extract(url)
+        if result:
+            await log_info(ctx, "Fetch Finished (Tavily)!", debug)
+            return result
+
+        await log_info(ctx, "Tavily unavailable or failed, trying Firecrawl...", debug)
+        result = await _call_firecrawl_scrape(url, ctx)
+        if result:
+            await log_info(ctx, "Fetch Finished (Firecrawl)!", debug)
+            return result
     return None
 
 
+async def _extract_content_parallel(url: str, ctx=None, debug: bool = False) -> str | None:
+    """Tavily 与 Firecrawl 同时发起，耗时取两者较大值而非之和；仍优先采用 Tavily 结果"""
+    firecrawl_task = asyncio.create_task(_call_firecrawl_scrape(url, ctx))
+    try:
+        result = await _call_tavily_extract(url)
+        if result:
+            await log_info(ctx, "Fetch Finished (Tavily)!", debug)
+            return result
+
+        result = await firecrawl_task
+        if result:
+            await log_info(ctx, "Fetch Finished (Firecrawl)!", debug)
+            return result
+        return None
+    finally:
+        if not firecrawl_task.done():
+            firecrawl_task.cancel()
+
+
 @mcp.tool(
     name="web_fetch",
     output_schema=None,
@@ -351,20 +547,30 @@ async def web_fetch(
     url: Annotated[str, "Valid HTTP/HTTPS web address pointing to the target page. Must be complete and accessible."],
     ctx: Context = None
 ) -> str:
-    await log_info(ctx, f"Begin Fetch: {url}", config.debug_enabled)
-
-    result = await _call_tavily_extract(url)
-    if result:
-        await log_info(ctx, "Fetch Finished (Tavily)!", config.debug_enabled)
-        return result
-
-    await log_info(ctx, "Tavily unavailable or failed, trying Firecrawl...", config.debug_enabled)
-    result = await _call_firecrawl_scrape(url, ctx)
+    # 配置项每次读取都会回查环境变量与 .env，本次请求内只读一次
+    debug = config.debug_enabled
+    await log_info(ctx, f"Begin Fetch: {url}", debug)
+
+    cache_ttl = config.fetch_cache_ttl_seconds
+    if cache_ttl > 0:
+        cached = _FETCH_CACHE.get(url, cache_ttl)
+        if cached is not None:
+            await log_info(ctx, "Fetch Finished (Cache)!", debug)
+            return cached
+
+    # 端到端截止时间：排队 + Tavily + Firecrawl 重试合计不超过该值
+    deadline = config.fetch_timeout_seconds
+    try:
+        result = await asyncio.wait_for(_extract_content(url, ctx, debug), timeout=deadline)
+    except asyncio.TimeoutError:
+        await log_info(ctx, f"Fetch Timeout ({deadline}s)!", debug)
+        return f"提取超时: 请求超过{deadline}秒"
     if result:
-        await log_info(ctx, "Fetch Finished (Firecrawl)!", config.debug_enabled)
+        if cache_ttl > 0:
+            _FETCH_CACHE.set(url, result)
         return result
 
-    await log_info(ctx, "Fetch Failed!", config.debug_enabled)
+    await log_info(ctx, "Fetch Failed!", debug)
     if not config.tavily_api_keys and not config.firecrawl_api_key:
         return "配置错误: TAVILY_API_KEY / TAVILY_API_KEYS 和 FIRECRAWL_API_KEY 均未配置"
     return "提取失败: 所有提取服务均未能获取内容"
@@ -373,7 +579,6 @@ async def web_fetch(
 async def _call_tavily_map(url: str, instructions: str = None, max_depth: int = 1,
                            max_breadth: int = 20, limit: int = 50, timeout: int = 150) -> str:
     import httpx
-    import json
     client = _get_tavily_client()
     if not client.is_configured:
         return "配置错误: TAVILY_API_KEY / TAVILY_API_KEYS 未配置，请设置环境变量或本地 .env"
@@ -381,11 +586,11 @@ async def _call_tavily_map(url: str, instructions: str = None, max_depth: int =
         data = await client.map(url, instructions or "", max_depth, max_breadth, limit, timeout)
         if not data:
             return "映射失败: Tavily 未返回可用结果"
-        return json.dumps({
+        return _dumps({
             "base_url": data.get("base_url", ""),
             "results": data.get("results", []),
             "response_time": data.get("response_time", 0)
-        }, ensure_ascii=False, indent=2)
+        })
     except httpx.TimeoutException:
         return f"映射超时: 请求超过{timeout}秒"
     except httpx.HTTPStatusError as e:
@@ -442,7 +647,6 @@ async def web_map(
     meta={"version": "1.3.0", "author": "guda.studio"},
 )
 async def get_config_info() -> str:
-    import json
     import httpx
 
     config_info = config.get_config_info()
@@ -518,7 +722,7 @@ async def get_config_info() -> str:
 
     config_info["connection_test"] = test_result
 
-    return json.dumps(config_info, ensure_ascii=False, indent=2)
+    return _dumps(config_info)
 
 
 @mcp.tool(
@@ -542,7 +746,6 @@ async def get_config_info() -> str:
 async def switch_model(
     model: Annotated[str, "Model ID to switch to (e.g., 'grok-4-fast', 'grok-2-latest', 'grok-vision-beta')."]
 ) -> str:
-    import json
 
     try:
         previous_model = config.grok_model
@@ -557,20 +760,20 @@ async def switch_model(
             "config_file": str(config.config_file)
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return _dumps(result)
 
     except ValueError as e:
         result = {
             "status": "❌ 失败",
             "message": f"切换模型失败: {str(e)}"
         }
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return _dumps(result)
     except Exception as e:
         result = {
             "status": "❌ 失败",
             "message": f"未知错误: {str(e)}"
         }
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return _dumps(result)
 
 
 @mcp.tool(
@@ -594,7 +797,6 @@ async def switch_model(
 async def toggle_builtin_tools(
     action: Annotated[str, "Action to perform: 'on' (block built-in), 'off' (allow built-in), or 'status' (check current state)."] = "status"
 ) -> str:
-    import json
 
     # Locate project root
     root = Path.cwd()
@@ -634,12 +836,12 @@ async def toggle_builtin_tools(
     else:
         msg = f"官方工具当前{'已禁用' if blocked else '已启用'}"
 
-    return json.dumps({
+    return _dumps({
         "blocked": blocked,
         "deny_list": deny,
         "file": str(settings_path),
         "message": msg
-    }, ensure_ascii=False, indent=2)
+    })
 
 
 @mcp.tool(
@@ -666,7 +868,6 @@ async def plan_intent(
     unverified_terms: Annotated[str, "Comma-separated external terms to verify"] = "",
     is_revision: Annotated[bool, "True to overwrite existing intent"] = False,
 ) -> str:
-    import json
     data = {"core_question": core_question, "query_type": query_type, "time_sensitivity": time_sensitivity}
     if domain:
         data["domain"] = domain
@@ -676,10 +877,10 @@ async def plan_intent(
         data["ambiguities"] = _split_csv(ambiguities)
     if unverified_terms:
         data["unverified_terms"] = _split_csv(unverified_terms)
-    return json.dumps(planning_engine.process_phase(
+    return _dumps(planning_engine.process_phase(
         phase="intent_analysis", thought=thought, session_id=session_id,
         is_revision=is_revision, confidence=confidence, phase_data=data,
-    ), ensure_ascii=False, indent=2)
+    ))
 
 
 @mcp.tool(
@@ -697,15 +898,14 @@ async def plan_complexity(
     confidence: Annotated[float, "Confidence 0.0-1.0"] = 1.0,
     is_revision: Annotated[bool, "True to overwrite"] = False,
 ) -> str:
-    import json
     if not planning_engine.get_session(session_id):
         return json.dumps({"error": f"Session '{session_id}' not found. Call plan_intent first."})
-    return json.dumps(planning_engine.process_phase(
+    return _dumps(planning_engine.process_phase(
         phase="complexity_assessment", thought=thought, session_id=session_id,
         is_revision=is_revision, confidence=confidence,
         phase_data={"level": level, "estimated_sub_queries": estimated_sub_queries,
                      "estimated_tool_calls": estimated_tool_calls, "justification": justification},
-    ), ensure_ascii=False, indent=2)
+    ))
 
 
 @mcp.tool(
@@ -725,7 +925,6 @@ async def plan_sub_query(
     tool_hint: Annotated[str, "web_search | web_fetch | web_map"] = "",
     is_revision: Annotated[bool, "True to replace all sub-queries"] = False,
 ) -> str:
-    import json
     if not planning_engine.get_session(session_id):
         return json.dumps({"error": f"Session '{session_id}' not found. Call plan_intent first."})
     item = {"id": id, "goal": goal, "expected_output": expected_output, "boundary": boundary}
@@ -733,10 +932,10 @@ async def plan_sub_query(
         item["depends_on"] = _split_csv(depends_on)
     if tool_hint:
         item["tool_hint"] = tool_hint
-    return json.dumps(planning_engine.process_phase(
+    return _dumps(planning_engine.process_phase(
         phase="query_decomposition", thought=thought, session_id=session_id,
         is_revision=is_revision, confidence=confidence, phase_data=item,
-    ), ensure_ascii=False, indent=2)
+    ))
 
 
 @mcp.tool(
@@ -755,7 +954,6 @@ async def plan_search_term(
     fallback_plan: Annotated[str, "Fallback if primary searches fail"] = "",
     is_revision: Annotated[bool, "True to replace all search terms"] = False,
 ) -> str:
-    import json
     if not planning_engine.get_session(session_id):
         return json.dumps({"error": f"Session '{session_id}' not found. Call plan_intent first."})
     data = {"search_terms": [{"term": term, "purpose": purpose, "round": round}]}
@@ -763,10 +961,10 @@ async def plan_search_term(
         data["approach"] = approach
     if fallback_plan:
         data["fallback_plan"] = fallback_plan
-    return json.dumps(planning_engine.process_phase(
+    return _dumps(planning_engine.process_phase(
         phase="search_strategy", thought=thought, session_id=session_id,
         is_revision=is_revision, confidence=confidence, phase_data=data,
-    ), ensure_ascii=False, indent=2)
+    ))
 
 
 @mcp.tool(
@@ -784,7 +982,6 @@ async def plan_tool_mapping(
     params_json: Annotated[str, "Optional JSON string for tool-specific params"] = "",
     is_revision: Annotated[bool, "True to replace all mappings"] = False,
 ) -> str:
-    import json
     if not planning_engine.get_session(session_id):
         return json.dumps({"error": f"Session '{session_id}' not found. Call plan_intent first."})
     item = {"sub_query_id": sub_query_id, "tool": tool, "reason": reason}
@@ -793,10 +990,10 @@ async def plan_tool_mapping(
             item["params"] = json.loads(params_json)
         except json.JSONDecodeError:
             pass
-    return json.dumps(planning_engine.process_phase(
+    return _dumps(planning_engine.process_phase(
         phase="tool_selection", thought=thought, session_id=session_id,
         is_revision=is_revision, confidence=confidence, phase_data=item,
-    ), ensure_ascii=False, indent=2)
+    ))
 
 
 @mcp.tool(
@@ -813,16 +1010,15 @@ async def plan_execution(
     confidence: Annotated[float, "Confidence 0.0-1.0"] = 1.0,
     is_revision: Annotated[bool, "True to overwrite"] = False,
 ) -> str:
-    import json
     if not planning_engine.get_session(session_id):
         return json.dumps({"error": f"Session '{session_id}' not found. Call plan_intent first."})
     parallel = [_split_csv(g) for g in parallel_groups.split(";") if g.strip()] if parallel_groups else []
     seq = _split_csv(sequential)
-    return json.dumps(planning_engine.process_phase(
+    return _dumps(planning_engine.process_phase(
         phase="execution_order", thought=thought, session_id=session_id,
         is_revision=is_revision, confidence=confidence,
         phase_data={"parallel": parallel, "sequential": seq, "estimated_rounds": estimated_rounds},
-    ), ensure_ascii=False, indent=2)
+    ))
 
 
 def main():
@@ -833,6 +1029,7 @@ def main():
     # 信号处理（仅主线程）
     if threading.current_thread() is threading.main_thread():
         def handle_shutdown(signum, frame):
+            shutdown_logging()
             os._exit(0)
         signal.signal(signal.SIGINT, handle_shutdown)
         if sys.platform != 'win32':
@@ -860,6 +1057,7 @@ def main():
         def monitor_parent():
             while True:
                 if not is_parent_alive(parent_pid):
+                    shutdown_logging()
                     os._exit(0)
                 time.sleep(2)
 
@@ -870,6 +1068,7 @@ def main():
     except KeyboardInterrupt:
         pass
     finally:
+        shutdown_logging()
         os._exit(0)
 
 
@@ -23,6 +23,10 @@ _SOURCES_HEADING_PATTERN = re.compile(
 _SOURCES_FUNCTION_PATTERN = re.compile(
     r"(?im)(^|\n)\s*(sources|source|citations|citation|references|reference|citation_card|source_cards|source_card)\s*\("
 )
+_LIST_MARKER_PATTERN = re.compile(r"^\s*(?:[-*]|\d+\.)\s*")
+_DETAILS_OPEN_PATTERN = re.compile(r"<details", re.IGNORECASE)
+_CALL_SIGNIFICANT_PATTERN = re.compile(r"[()'\"\\]")
+_NON_LF_LINE_BREAK_PATTERN = re.compile(r"[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
 
 
 def new_session_id() -> str:
@@ -119,18 +123,17 @@ def _extract_balanced_call_at_end(text: str, open_paren_idx: int) -> tuple[int,
 
     depth = 1
     in_string: str | None = None
-    escape = False
+    pos = open_paren_idx + 1
 
-    for idx in range(open_paren_idx + 1, len(text)):
+    # 直接跳到下一个括号/引号/反斜杠，普通字符交给正则在 C 层跳过
+    while (m := _CALL_SIGNIFICANT_PATTERN.search(text, pos)) is not None:
+        idx = m.start()
         ch = text[idx]
+        pos = idx + 1
         if in_string:
-            if escape:
-                escape = False
-                continue
             if ch == "\\":
-                escape = True
-                continue
-            if ch == in_string:
+                pos += 1
+            elif ch == in_string:
                 in_string = None
             continue
 
@@ -169,55 +172,55 @@ def _split_heading_sources(text: str) -> tuple[str, list[dict]] | None:
 
 
 def _split_tail_link_block(text: str) -> tuple[str, list[dict]] | None:
-    lines = text.splitlines()
-    if not lines:
-        return None
+    # 与 splitlines() 语义保持一致：含 \r、\u2028 等其他换行符时先统一为 \n
+    if _NON_LF_LINE_BREAK_PATTERN.search(text):
+        text = "\n".join(text.splitlines())
 
-    idx = len(lines) - 1
-    while idx >= 0 and not lines[idx].strip():
-        idx -= 1
-    if idx < 0:
+    # 从末尾按行反向扫描，只切出尾部链接块涉及的行，不对整段回答 splitlines
+    end = len(text.rstrip())
+    if end == 0:
         return None
 
-    tail_end = idx
+    tail_start = end
     link_like_count = 0
-    while idx >= 0:
-        line = lines[idx].strip()
-        if not line:
-            idx -= 1
-            continue
-        if not _is_link_only_line(line):
-            break
-        link_like_count += 1
-        idx -= 1
+    pos = end
+    while pos >= 0:
+        line_start = text.rfind("\n", 0, pos) + 1
+        line = text[line_start:pos].strip()
+        if line:
+            if not _is_link_only_line(line):
+                break
+            link_like_count += 1
+        tail_start = line_start
+        pos = line_start - 1
 
-    tail_start = idx + 1
     if link_like_count < 2:
         return None
 
-    block_text = "\n".join(lines[tail_start : tail_end + 1])
+    block_text = text[tail_start:end]
     sources = _extract_sources_from_text(block_text)
     if not sources:
         return None
 
-    answer = "\n".join(lines[:tail_start]).rstrip()
+    answer = text[:tail_start].rstrip()
     return answer, sources
 
 
 def _split_details_block_sources(text: str) -> tuple[str, list[dict]] | None:
-    lower = text.lower()
-    close_idx = lower.rfind("</details>")
-    if close_idx == -1:
-        return None
-    tail = text[close_idx + len("</details>") :].strip()
-    if tail:
+    # 仅当 </details> 位于末尾时才处理：先检查结尾，避免对整段回答做 lower() 拷贝
+    body = text.rstrip()
+    close_tag = "</details>"
+    if body[-len(close_tag):].lower() != close_tag:
         return None
+    close_idx = len(body) - len(close_tag)
 
-    open_idx = lower.rfind("<details", 0, close_idx)
+    open_idx = -1
+    for m in _DETAILS_OPEN_PATTERN.finditer(body, 0, close_idx):
+        open_idx = m.start()
     if open_idx == -1:
         return None
 
-    block_text = text[open_idx : close_idx + len("</details>")]
+    block_text = body[open_idx:]
     sources = _extract_sources_from_text(block_text)
     if len(sources) < 2:
         return None
@@ -227,7 +230,7 @@ def _split_details_block_sources(text: str) -> tuple[str, list[dict]] | None:
 
 
 def _is_link_only_line(line: str) -> bool:
-    stripped = re.sub(r"^\s*(?:[-*]|\d+\.)\s*", "", line).strip()
+    stripped = _LIST_MARKER_PATTERN.sub("", line, count=1).strip()
     if not stripped:
         return False
     if stripped.startswith(("http://", "https://")):
@@ -20,7 +20,7 @@ def extract_unique_urls(text: str) -> list[str]:
 def format_extra_sources(tavily_results: list[dict] | None, firecrawl_results: list[dict] | None) -> str:
     sections = []
     idx = 1
-    urls = []
+    urls: set[str] = set()
     if firecrawl_results:
         lines = ["## Extra Sources [Firecrawl]"]
         for r in firecrawl_results:
@@ -30,7 +30,7 @@ def format_extra_sources(tavily_results: list[dict] | None, firecrawl_results: l
                 continue
             if url in urls:
                 continue
-            urls.append(url)
+            urls.add(url)
             desc = r.get("description", "")
             lines.append(f"{idx}. **[{title}]({url})**")
             if desc:
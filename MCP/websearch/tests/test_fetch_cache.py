@@ -0,0 +1,21 @@
+from web_search.server import _FetchCache
+
+
+def test_fetch_cache_evicts_lru_when_over_char_budget():
+    cache = _FetchCache(max_size=10, max_chars=10)
+    cache.set("a", "xxxx")
+    cache.set("b", "yyyy")
+    assert cache.get("a", 60) == "xxxx"
+    cache.set("c", "zzzz")
+    assert cache.get("b", 60) is None
+    assert cache.get("a", 60) == "xxxx"
+    assert cache.get("c", 60) == "zzzz"
+
+
+def test_fetch_cache_skips_entries_larger_than_budget():
+    cache = _FetchCache(max_size=10, max_chars=10)
+    cache.set("a", "xxxx")
+    cache.set("a", "x" * 11)
+    assert cache.get("a", 60) is None
+    cache.set("b", "y" * 10)
+    assert cache.get("b", 60) == "y" * 10
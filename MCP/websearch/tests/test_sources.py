@@ -0,0 +1,71 @@
+from web_search.sources import (
+    _extract_balanced_call_at_end,
+    _extract_sources_from_text,
+    split_answer_and_sources,
+)
+
+
+def test_extract_sources_markdown_links_first_then_bare_urls():
+    text = "见 https://c.com/z。另见 [A](https://a.com/x) 与 [B](https://b.com/y)"
+    assert _extract_sources_from_text(text) == [
+        {"title": "A", "url": "https://a.com/x"},
+        {"title": "B", "url": "https://b.com/y"},
+        {"url": "https://c.com/z"},
+    ]
+
+
+def test_extract_sources_bare_url_touching_markdown_link_keeps_link():
+    # 裸 URL 紧贴 Markdown 链接时，链接本身仍需被识别
+    assert _extract_sources_from_text("https://b.com/y[t](https://a.com/x)") == [
+        {"title": "t", "url": "https://a.com/x"},
+        {"url": "https://b.com/y[t](https://a.com/x"},
+    ]
+
+
+def test_split_details_block_sources():
+    text = (
+        "Answer.\n\n<DETAILS><summary>Sources</summary>\n"
+        "https://b.com/y[t](https://a.com/x) and [u](https://c.com)\n"
+        "</Details>  \n"
+    )
+    answer, sources = split_answer_and_sources(text)
+    assert answer == "Answer."
+    assert [s["url"] for s in sources][:2] == ["https://a.com/x", "https://c.com"]
+
+
+def test_details_block_not_at_end_is_ignored():
+    text = "<details>[A](https://a.com) [B](https://b.com)</details>\nMore answer text."
+    assert split_answer_and_sources(text) == (text, [])
+
+
+def test_extract_balanced_call_handles_quotes_and_escapes():
+    text = 'sources("a )", \'b \\\' (\', ("c"))'
+    open_idx = text.index("(")
+    assert _extract_balanced_call_at_end(text, open_idx) == (
+        len(text) - 1,
+        text[open_idx + 1 : -1],
+    )
+    assert _extract_balanced_call_at_end(text + " trailing", open_idx) is None
+    assert _extract_balanced_call_at_end('sources("unterminated)', 7) is None
+
+
+def test_split_function_call_sources():
+    text = (
+        "Answer text.\n\n"
+        'sources([{"title": "A (x)", "url": "https://a.com"}, '
+        '{"title": "B \\" )", "url": "https://b.com"}])'
+    )
+    answer, sources = split_answer_and_sources(text)
+    assert answer == "Answer text."
+    assert sources == [
+        {"url": "https://a.com", "title": "A (x)"},
+        {"url": "https://b.com", "title": 'B " )'},
+    ]
+
+
+def test_split_tail_link_block_treats_other_line_breaks_like_newlines():
+    for sep in ("\n", "\r\n", "\r", " ", "\x85"):
+        text = f"Answer.{sep}{sep}https://a.com/x{sep}https://b.com/y{sep}"
+        answer, sources = split_answer_and_sources(text)
+        assert answer == "Answer."
+        assert [s["url"] for s in sources] == ["https://a.com/x", "https://b.com/y"]